@@ -14,8 +14,13 @@
 
         propagatedBuildInputs = with pkgs.python3.pkgs; [
           httpx
+          h2
           beautifulsoup4
+          lxml
+          soupsieve
           discordpy
+          rapidfuzz
+          orjson
         ];
       };
     };
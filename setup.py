@@ -2,9 +2,13 @@
 from setuptools import setup
 
 install_requires = [
-    "httpx",
+    "httpx[http2]",
     "beautifulsoup4",
+    "lxml",
+    "soupsieve",
     "discord.py",
+    "rapidfuzz",
+    "orjson",
 ]
 
 setup(
@@ -20,7 +24,7 @@ setup(
     install_requires=install_requires,
     license="mit",
     include_package_data=False,
-    python_requires=">=3.7",
+    python_requires=">=3.10",
     entry_points={"console_scripts": "wtm-bot = wtm_bot.discord_bot:main"},
     classifiers=["License :: OSI Approved :: MIT License"],
 )
@@ -1,34 +1,49 @@
 import asyncio
+import concurrent.futures
 import dataclasses
 import datetime
-import difflib
 import enum
+import heapq
 import io
-import json
 import logging
 import os
 import random
 import re
 import sys
 import time
-from collections import defaultdict
+from collections import Counter
 from dataclasses import dataclass
 from typing import Dict, List
 
 import discord
+import httpx
+import orjson
+from rapidfuzz import fuzz, process
 
 from wtm_bot.table import Heading, Justify, Table
-from wtm_bot.wtm import Difficulty, WtmSession
+from wtm_bot.wtm import Difficulty, TmdbClient, WtmSession
 
 NB_SHOTS = 12
+NB_PARALLEL_FETCHES = 3
+SHOTS_QUEUE_SIZE = 3
 GUESS_TIME_SECONDS = 30
 MAX_COMBO = 2
+MIN_GUESS_SCORE = 0.8
+MAX_GUESS_LENGTH = 200
+GUESSES_CACHE_SIZE = 256
 STATS_DIR = os.environ.get(
     "STATS_DIR", os.path.join(os.path.abspath(os.path.dirname(__file__)), "stats")
 )
 
+FRANCHISE_GUESS_RE = re.compile(r"(harry|indiana) fucking (potter|jones)")
+CONGRATS_MESSAGES = ("yay", "correct", "nice", "good job", "👏", "you rock")
+RANKING_MEDALS = ("🥇", "🥈", "🥉")
+DIFFICULTIES_BY_VALUE = {difficulty.value: difficulty for difficulty in Difficulty}
+INVALID_DIFFICULTY_MESSAGE = "Please select a valid difficulty: " + ", ".join(
+    f"**{difficulty.value}**" for difficulty in Difficulty
+)
+
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 
 class GameStatus(enum.Enum):
@@ -37,31 +52,40 @@ class GameStatus(enum.Enum):
     LOADING = enum.auto()
 
 
+class Signal(enum.Enum):
+    NEW_SHOT = enum.auto()
+    SHOT_TIMEOUT = enum.auto()
+    SHOT_SKIPPED = enum.auto()
+    CORRECT_GUESS = enum.auto()
+    INCORRECT_GUESS = enum.auto()
+    GAME_FINISHED = enum.auto()
+
+
 class CommandType(enum.Enum):
     START = "start"
     HELP = "help"
     STATS = "stats"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Command:
     type: CommandType
     args: List[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Combo:
     player: str
     combo: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FuzzyResult:
     match: str
     score: float
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Stat:
     player_id: str
     player_name: str
@@ -74,8 +98,23 @@ class Stat:
     reaction_time: float
     precision: float
 
+    def asdict(self):
+        # Faster than `dataclasses.asdict`, which recursively deep copies fields
+        return {
+            "player_id": self.player_id,
+            "player_name": self.player_name,
+            "nb_guesses": self.nb_guesses,
+            "nb_shots_played": self.nb_shots_played,
+            "nb_correct_guesses": self.nb_correct_guesses,
+            "nb_skips": self.nb_skips,
+            "nb_aces": self.nb_aces,
+            "max_streak": self.max_streak,
+            "reaction_time": self.reaction_time,
+            "precision": self.precision,
+        }
+
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class PlayerStat:
     player_id: str
     player_name: str
@@ -89,32 +128,55 @@ class PlayerStat:
     precision: float
     nb_games: int = 1
 
-    def __add__(self, other):
-        return PlayerStat(
-            player_id=other.player_id,
-            player_name=other.player_name,
-            nb_guesses=self.nb_guesses + other.nb_guesses,
-            nb_shots_played=self.nb_shots_played + other.nb_shots_played,
-            nb_correct_guesses=self.nb_correct_guesses + other.nb_correct_guesses,
-            nb_skips=self.nb_skips + other.nb_skips,
-            nb_aces=self.nb_aces + other.nb_aces,
-            max_streak=max(self.max_streak, other.max_streak),
-            reaction_time=(
+    @classmethod
+    def from_stat(cls, stat):
+        return cls(
+            player_id=stat.player_id,
+            player_name=stat.player_name,
+            nb_guesses=stat.nb_guesses,
+            nb_shots_played=stat.nb_shots_played,
+            nb_correct_guesses=stat.nb_correct_guesses,
+            nb_skips=stat.nb_skips,
+            nb_aces=stat.nb_aces,
+            max_streak=stat.max_streak,
+            reaction_time=stat.reaction_time,
+            precision=stat.precision,
+        )
+
+    def add(self, stat):
+        """
+        Add the `Stat` of another game to the player stats, in place.
+        """
+        nb_shots_played = self.nb_shots_played + stat.nb_shots_played
+        nb_correct_guesses = self.nb_correct_guesses + stat.nb_correct_guesses
+
+        self.reaction_time = (
+            (
                 self.reaction_time * self.nb_shots_played
-                + other.reaction_time * other.nb_shots_played
+                + stat.reaction_time * stat.nb_shots_played
             )
-            / (self.nb_shots_played + other.nb_shots_played)
-            if self.nb_shots_played + other.nb_shots_played > 0
-            else 0,
-            precision=(
+            / nb_shots_played
+            if nb_shots_played > 0
+            else 0
+        )
+        self.precision = (
+            (
                 self.precision * self.nb_correct_guesses
-                + other.precision * other.nb_correct_guesses
+                + stat.precision * stat.nb_correct_guesses
             )
-            / (self.nb_correct_guesses + other.nb_correct_guesses)
-            if self.nb_correct_guesses + other.nb_correct_guesses > 0
-            else 0,
-            nb_games=self.nb_games + 1,
+            / nb_correct_guesses
+            if nb_correct_guesses > 0
+            else 0
         )
+        self.player_id = stat.player_id
+        self.player_name = stat.player_name
+        self.nb_guesses += stat.nb_guesses
+        self.nb_shots_played = nb_shots_played
+        self.nb_correct_guesses = nb_correct_guesses
+        self.nb_skips += stat.nb_skips
+        self.nb_aces += stat.nb_aces
+        self.max_streak = max(self.max_streak, stat.max_streak)
+        self.nb_games += 1
 
     @property
     def avg_guesses_per_game(self):
@@ -129,7 +191,7 @@ class PlayerStat:
         return self.nb_correct_guesses / self.nb_guesses * 100
 
 
-@dataclasses.dataclass()
+@dataclasses.dataclass(slots=True)
 class GameStats:
     difficulty: Difficulty
     stats: Dict[int, Stat] = dataclasses.field(default_factory=dict)
@@ -141,7 +203,7 @@ class GameStats:
         try:
             return self.stats[player_id]
         except KeyError:
-            return Stat(
+            stat = self.stats[player_id] = Stat(
                 player_id=player_id,
                 player_name=player_name,
                 nb_guesses=0,
@@ -153,10 +215,10 @@ class GameStats:
                 max_streak=0,
                 precision=0,
             )
+            return stat
 
     def skip(self, player_id, player_name):
-        stat = self.get_stat(player_id, player_name)
-        self.stats[player_id] = dataclasses.replace(stat, nb_skips=stat.nb_skips + 1)
+        self.get_stat(player_id, player_name).nb_skips += 1
 
     def guess(
         self,
@@ -169,52 +231,82 @@ class GameStats:
         precision,
     ):
         stat = self.get_stat(player_id, player_name)
-        self.stats[player_id] = dataclasses.replace(
-            stat,
-            nb_guesses=stat.nb_guesses + 1,
-            nb_shots_played=stat.nb_shots_played + (0 if reaction_time is None else 1),
-            nb_correct_guesses=stat.nb_correct_guesses + (1 if is_correct else 0),
-            reaction_time=(stat.reaction_time * stat.nb_shots_played + reaction_time)
-            / (stat.nb_shots_played + 1)
-            if reaction_time is not None
-            else stat.reaction_time,
-            nb_aces=stat.nb_aces + (1 if is_ace else 0),
-            max_streak=max(stat.max_streak, streak),
-            precision=(stat.precision * stat.nb_correct_guesses + precision)
-            / (stat.nb_correct_guesses + 1)
-            if precision is not None
-            else stat.precision,
-        )
 
-    @staticmethod
-    def load(file_path, difficulty) -> List["GameStats"]:
-        with open(file_path, "r") as f:
-            stats_list = json.loads(f.read())
-
-        stats = [
-            GameStats(
-                started_at=datetime.datetime.fromtimestamp(
-                    stat["started_at"], datetime.timezone.utc
-                ),
-                stats={
-                    int(player_id): Stat(**obj)
-                    for player_id, obj in stat["stats"].items()
-                },
-                difficulty=Difficulty(stat["difficulty"]),
+        if reaction_time is not None:
+            stat.reaction_time = (
+                stat.reaction_time * stat.nb_shots_played + reaction_time
+            ) / (stat.nb_shots_played + 1)
+            stat.nb_shots_played += 1
+
+        if precision is not None:
+            stat.precision = (stat.precision * stat.nb_correct_guesses + precision) / (
+                stat.nb_correct_guesses + 1
             )
-            for stat in stats_list
+
+        stat.nb_guesses += 1
+        stat.nb_correct_guesses += 1 if is_correct else 0
+        stat.nb_aces += 1 if is_ace else 0
+        stat.max_streak = max(stat.max_streak, streak)
+
+    @staticmethod
+    def read_file(file_path) -> List[dict]:
+        """
+        Return the raw games stored in the given stats file. Stats files contain
+        one JSON object per game and per line, but older files contain a single
+        JSON array with all the games.
+        """
+        with open(file_path, "rb") as f:
+            content = f.read()
+
+        if content.startswith(b"["):
+            return orjson.loads(content)
+
+        return [orjson.loads(line) for line in content.splitlines() if line]
+
+    @staticmethod
+    def load_stats(file_path, difficulty) -> List[Stat]:
+        """
+        Return the stats of each player of each game of the given difficulty
+        stored in the given stats file. Only the player stats are loaded, as
+        that’s all the stats ranking needs.
+        """
+        return [
+            Stat(**obj)
+            for stat in GameStats.read_file(file_path)
             if difficulty == Difficulty.ALL or stat["difficulty"] == difficulty.value
+            for obj in stat["stats"].values()
         ]
 
-        return stats
+    def save(self, file_path):
+        """
+        Append the game to the given stats file. Files still using the old
+        single array format are converted to one game per line first.
+        """
+        try:
+            with open(file_path, "rb") as f:
+                is_array_file = f.read(1) == b"["
+        except FileNotFoundError:
+            is_array_file = False
+
+        if is_array_file:
+            stats_list = GameStats.read_file(file_path) + [self.asdict()]
+            mode = "wb"
+        else:
+            stats_list = [self.asdict()]
+            mode = "ab"
+
+        with open(file_path, mode) as f:
+            f.writelines(
+                orjson.dumps(stat, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+                for stat in stats_list
+            )
 
     def asdict(self):
         return {
             "difficulty": self.difficulty.value,
             "started_at": self.started_at.timestamp(),
             "stats": {
-                player_id: dataclasses.asdict(stat)
-                for player_id, stat in self.stats.items()
+                player_id: stat.asdict() for player_id, stat in self.stats.items()
             },
         }
 
@@ -223,38 +315,94 @@ def get_stats_file_path(game_id: int) -> str:
     return os.path.join(STATS_DIR, f"{game_id}.json")
 
 
-def _fuzzy_compare_str(str1, str2):
-    str1, str2 = str1.lower(), str2.lower()
+def get_fuzzy_candidates(solutions):
+    """
+    Return a dict mapping the lowercased parts of the given solutions (the
+    whole title as well as each part of the title split on colons) to the
+    solution they come from, to be passed to `fuzzy_compare`.
+    """
+    candidates = {}
 
-    # I mean come on, no one ever knows the name of the episode
-    if (
-        "harry potter" in str1
-        and "harry fucking potter" in str2
-        or "indiana jones" in str1
-        and "indiana fucking jones" in str2
-    ):
-        return 1
+    for solution in solutions:
+        solution_lower = solution.lower()
+        for part in solution_lower.split(":") + [solution_lower]:
+            candidates.setdefault(part.strip(), solution)
 
-    str1_parts = str1.split(":") + [str1]
-    max_ratio = max(
-        difflib.SequenceMatcher(lambda x: x in " \t", str1_part, str2).ratio()
-        for str1_part in str1_parts
+    return candidates
+
+
+def fuzzy_compare(candidates, guess):
+    """
+    Compare the candidates returned by `get_fuzzy_candidates` and a guess, and
+    return the highest scoring solution as a `FuzzyResult`, or `None` if
+    there’s no match.
+    """
+    guess = guess.lower()
+    if guess in candidates:
+        return FuzzyResult(match=candidates[guess], score=1)
+
+    # I mean come on, no one ever knows the name of the episode
+    franchise_match = FRANCHISE_GUESS_RE.search(guess)
+    if franchise_match:
+        franchise = " ".join(franchise_match.groups())
+        for candidate, solution in candidates.items():
+            if franchise in candidate:
+                return FuzzyResult(match=solution, score=1)
+
+    prefix_candidates = []
+    matching_candidates = []
+    for candidate in candidates:
+        max_score = 2 * min(len(candidate), len(guess)) / (len(candidate) + len(guess))
+
+        # Upper bound of the similarity, skip candidates that can't reach the
+        # minimum score because of their length alone
+        if max_score < MIN_GUESS_SCORE:
+            continue
+
+        # Truncated titles are the most common close guess, and for a prefix
+        # the length ratio is the exact similarity so there's no need to
+        # compute it
+        if candidate.startswith(guess):
+            prefix_candidates.append(candidate)
+        else:
+            matching_candidates.append(candidate)
+
+    best_result = None
+    score_cutoff = MIN_GUESS_SCORE
+    if prefix_candidates:
+        # The shortest prefix scores the highest, sort ties alphabetically so
+        # that the result doesn't depend on the order of the candidates
+        candidate = min(prefix_candidates, key=lambda c: (len(c), c))
+        score_cutoff = 2 * len(guess) / (len(candidate) + len(guess))
+        best_result = FuzzyResult(match=candidates[candidate], score=score_cutoff)
+
+    # Score the other candidates in a single call so that the guess only gets
+    # preprocessed once. Use the 0-100 scale of `fuzz.ratio`, as the cutoff of
+    # `Indel.normalized_similarity` is converted to a distance with a rounding
+    # error, which rejects scores of exactly MIN_GUESS_SCORE
+    best_match = process.extractOne(
+        guess,
+        matching_candidates,
+        scorer=fuzz.ratio,
+        score_cutoff=score_cutoff * 100,
     )
+    if best_match and (not best_result or best_match[1] / 100 > best_result.score):
+        candidate, score, _ = best_match
+        best_result = FuzzyResult(match=candidates[candidate], score=score / 100)
 
-    return max_ratio
+    return best_result
 
 
-def fuzzy_compare(solutions, guess):
+def is_guess(message):
     """
-    Compare a list of solutions and a guess, and return the highest scoring one
-    as a `FuzzyResult`, or `None` if there’s no match.
+    Return `False` if the given message can’t be a guess and shouldn’t be
+    compared to the solution: messages between parentheses, overly long
+    messages, and messages without any letter or digit (eg. emojis only).
     """
-    results = [
-        FuzzyResult(match=solution, score=_fuzzy_compare_str(solution, guess))
-        for solution in solutions
-    ]
+    if message.startswith("(") and message.endswith(")"):
+        return False
 
-    return max(results, key=lambda item: item.score, default=None)
+    return len(message) <= MAX_GUESS_LENGTH and any(char.isalnum() for char in message)
 
 
 class Round:
@@ -263,38 +411,83 @@ class Round:
         self.started_at = None
         self.guessers = set()
         self.skip_votes = set()
+        self.finished = asyncio.Event()
+        self.guesses_cache = {}
+        self.fuzzy_candidates = get_fuzzy_candidates(shot.all_titles)
 
     def start(self):
         self.started_at = time.monotonic()
-        return asyncio.create_task(asyncio.sleep(GUESS_TIME_SECONDS))
+
+    def finish(self):
+        self.finished.set()
+
+    async def wait(self):
+        """
+        Wait until the round is finished or until the guess time is over, in
+        which case the round gets finished. Return `True` if the round was
+        finished before the guess time was over.
+        """
+        try:
+            await asyncio.wait_for(self.finished.wait(), timeout=GUESS_TIME_SECONDS)
+        except asyncio.TimeoutError:
+            self.finish()
+            return False
+
+        return True
 
     @property
     def elapsed_time(self):
         return time.monotonic() - self.started_at if self.started_at else 0
 
-    def guess(self, player_id, guess):
-        fuzzy_result = fuzzy_compare(
-            set([self.shot.movie_title]) | self.shot.movie_alternative_titles,
-            guess,
-        )
+    async def guess(self, player_id, guess, executor=None):
         self.guessers.add(player_id)
 
+        # The same guesses tend to come up again and again during a round
+        # (typos, players guessing the same movie, etc)
+        guess = guess.lower()
+        # Move cache hits to the end so that spammed guesses are evicted last
+        try:
+            fuzzy_result = self.guesses_cache.pop(guess)
+        except KeyError:
+            pass
+        else:
+            self.guesses_cache[guess] = fuzzy_result
+            return fuzzy_result
+
+        # Compare in a thread so that busy channels don’t block the event loop
+        fuzzy_result = await asyncio.get_running_loop().run_in_executor(
+            executor, fuzzy_compare, self.fuzzy_candidates, guess
+        )
+
+        if len(self.guesses_cache) >= GUESSES_CACHE_SIZE:
+            del self.guesses_cache[next(iter(self.guesses_cache))]
+        self.guesses_cache[guess] = fuzzy_result
+
         return fuzzy_result
 
 
 class Game:
-    def __init__(self, *, wtm_user, wtm_password, tmdb_token, difficulty):
+    def __init__(
+        self,
+        *,
+        wtm_user,
+        wtm_password,
+        tmdb_client,
+        difficulty,
+        http_transport=None,
+        executor=None,
+    ):
         self.wtm_user = wtm_user
         self.wtm_password = wtm_password
+        self.executor = executor
 
         self.difficulty = difficulty
-        self.scores = defaultdict(int)
+        self.scores = Counter()
         self.stats = GameStats(difficulty=difficulty)
-        self.wtm_session = WtmSession(tmdb_token)
+        self.wtm_session = WtmSession(tmdb_client, transport=http_transport)
         self.status = GameStatus.IDLE
-        self.guess_timer = None
-        self.shots_queue = asyncio.Queue()
-        self.signal_subscribers = defaultdict(list)
+        self.shots_queue = asyncio.Queue(maxsize=SHOTS_QUEUE_SIZE)
+        self.signal_subscribers = {signal: () for signal in Signal}
         self.current_round = None
         self.current_combo = None
 
@@ -303,13 +496,22 @@ class Game:
         return len(self.scores)
 
     async def handle_guess(self, player_id, player_name, guess, **kwargs):
-        if player_name not in self.scores:
-            self.scores[player_name] = 0
+        # Register the player even if they never score, so that they count for
+        # the skip votes
+        self.scores.setdefault(player_name, 0)
+
+        current_round = self.current_round
+        first_guess = player_id not in current_round.guessers
+        fuzzy_result = await current_round.guess(
+            player_id, guess, executor=self.executor
+        )
 
-        first_guess = player_id not in self.current_round.guessers
-        fuzzy_result = self.current_round.guess(player_id, guess)
+        # The round might have ended (correct guess, skip or timeout) while the
+        # guess was being compared
+        if current_round is not self.current_round or current_round.finished.is_set():
+            return
 
-        if fuzzy_result and fuzzy_result.score >= 0.8:
+        if fuzzy_result and fuzzy_result.score >= MIN_GUESS_SCORE:
             if self.current_combo and self.current_combo.player == player_name:
                 self.current_combo = dataclasses.replace(
                     self.current_combo,
@@ -334,14 +536,14 @@ class Game:
             self.scores[player_name] += scored_points
 
             self.status = GameStatus.LOADING
+            self.current_round.finish()
             await self.emit_signal(
-                "correct_guess",
+                Signal.CORRECT_GUESS,
                 player=player_name,
                 movie_title=fuzzy_result.match,
                 scored_points=scored_points,
                 **kwargs,
             )
-            self.guess_timer.cancel()
         else:
             self.stats.guess(
                 player_id=player_id,
@@ -355,7 +557,7 @@ class Game:
             if self.current_combo and self.current_combo.player == player_name:
                 self.current_combo = None
             await self.emit_signal(
-                "incorrect_guess", player=player_name, guess=guess, **kwargs
+                Signal.INCORRECT_GUESS, player=player_name, guess=guess, **kwargs
             )
 
     async def game_loop(self):
@@ -369,55 +571,78 @@ class Game:
         await guess_loop_task
 
     async def populate_queue(self):
-        for i in range(NB_SHOTS):
-            logging.debug("Fetching shot...")
-            shot = await self.wtm_session.get_random_shot(require_solution=True)
-            logging.debug("Got shot, putting it in the queue")
-            await self.shots_queue.put(shot)
+        semaphore = asyncio.Semaphore(NB_PARALLEL_FETCHES)
+
+        async def fetch_shot():
+            # Only release the semaphore once the shot is in the queue, so that
+            # no more shots are downloaded while the queue is full
+            async with semaphore:
+                logger.debug("Fetching shot...")
+                shot = await self.wtm_session.get_random_shot(require_solution=True)
+                logger.debug("Got shot, putting it in the queue")
+                await self.shots_queue.put(shot)
+
+        await asyncio.gather(*(fetch_shot() for i in range(NB_SHOTS)))
 
     async def guess_loop(self):
-        logging.info("Starting guess loop")
+        logger.info("Starting guess loop")
         shot_number = 1
         while not self.populate_queue_task.done() or self.shots_queue.qsize() > 0:
-            logging.debug("Getting shot from queue")
+            logger.debug("Getting shot from queue")
             shot = await self.shots_queue.get()
-            logging.debug("Got shot from queue")
-            logging.debug("Movie title: %s", shot.movie_title)
+            logger.debug("Got shot from queue")
+            logger.debug("Movie title: %s", shot.movie_title)
 
             self.current_round = Round(shot)
-            await self.emit_signal("new_shot", shot_number=shot_number)
-            self.guess_timer = self.current_round.start()
+            await self.emit_signal(Signal.NEW_SHOT, shot_number=shot_number)
+            self.current_round.start()
             self.status = GameStatus.WAITING_FOR_GUESSES
 
-            try:
-                await self.guess_timer
-            except asyncio.CancelledError:
-                self.status = GameStatus.IDLE
-            else:
+            finished = await self.current_round.wait()
+            self.status = GameStatus.IDLE
+            if not finished:
                 self.current_combo = None
-                self.status = GameStatus.IDLE
-                await self.emit_signal("shot_timeout")
+                await self.emit_signal(Signal.SHOT_TIMEOUT)
 
             # Sleep a bit after the solution was shown to let people cool down
             await asyncio.sleep(3)
 
             shot_number += 1
 
-        await self.emit_signal("game_finished")
+        await self.emit_signal(Signal.GAME_FINISHED)
 
     async def skip(self):
-        await self.emit_signal("shot_skipped")
-        self.guess_timer.cancel()
-
-    async def emit_signal(self, signal_name, *args, **kwargs):
-        subscribers_to_notify = self.signal_subscribers[signal_name]
-        if len(subscribers_to_notify) > 0:
-            asyncio.gather(
-                *(subscriber(*args, **kwargs) for subscriber in subscribers_to_notify)
+        self.status = GameStatus.LOADING
+        self.current_round.finish()
+        await self.emit_signal(Signal.SHOT_SKIPPED)
+
+    async def emit_signal(self, signal, *args, **kwargs):
+        subscribers_to_notify = self.signal_subscribers[signal]
+
+        # A failing subscriber (eg. a Discord message that can’t be sent) is
+        # logged so that it doesn’t abort the game or hide the other ones.
+        # Signals usually have a single subscriber (the UI), in which case
+        # there’s no need to wrap it in a task
+        if len(subscribers_to_notify) == 1:
+            try:
+                await subscribers_to_notify[0](*args, **kwargs)
+            except Exception:
+                logger.exception("Subscriber to signal %s failed", signal)
+        elif len(subscribers_to_notify) > 1:
+            results = await asyncio.gather(
+                *(subscriber(*args, **kwargs) for subscriber in subscribers_to_notify),
+                return_exceptions=True,
             )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Subscriber to signal %s failed", signal, exc_info=result
+                    )
 
-    def subscribe_to_signal(self, signal_name, callback):
-        self.signal_subscribers[signal_name].append(callback)
+    def subscribe_to_signal(self, signal, callback):
+        # Subscriptions only happen when the UI is created, whereas signals are
+        # emitted all along the game, so store them as tuples
+        self.signal_subscribers[signal] += (callback,)
 
     async def vote_skip(self, player_id, player_name):
         logger.debug("Player voted to skip")
@@ -444,26 +669,23 @@ class DiscordUi:
         self.game = game
         self.shot_message = None
 
-        self.game.subscribe_to_signal("shot_skipped", self.shot_skipped)
-        self.game.subscribe_to_signal("game_finished", self.game_finished)
-        self.game.subscribe_to_signal("shot_timeout", self.shot_timeout)
-        self.game.subscribe_to_signal("new_shot", self.new_shot)
-        self.game.subscribe_to_signal("correct_guess", self.correct_guess)
-        self.game.subscribe_to_signal("incorrect_guess", self.incorrect_guess)
+        self.game.subscribe_to_signal(Signal.SHOT_SKIPPED, self.shot_skipped)
+        self.game.subscribe_to_signal(Signal.GAME_FINISHED, self.game_finished)
+        self.game.subscribe_to_signal(Signal.SHOT_TIMEOUT, self.shot_timeout)
+        self.game.subscribe_to_signal(Signal.NEW_SHOT, self.new_shot)
+        self.game.subscribe_to_signal(Signal.CORRECT_GUESS, self.correct_guess)
+        self.game.subscribe_to_signal(Signal.INCORRECT_GUESS, self.incorrect_guess)
 
     def get_ranking(self, scores):
-        ranking = [
-            item
-            for item in sorted(scores.items(), key=lambda item: item[1], reverse=True)
-        ]
         return [
             f"{symbol} - {name} - {score} pts"
-            for symbol, (name, score) in zip(["🥇", "🥈", "🥉"], ranking)
+            for symbol, (name, score) in zip(
+                RANKING_MEDALS, scores.most_common(len(RANKING_MEDALS))
+            )
         ]
 
     async def correct_guess(self, player, message, movie_title, scored_points):
-        congrats_messages = ["yay", "correct", "nice", "good job", "👏", "you rock"]
-        congrats_message = random.choice(congrats_messages)
+        congrats_message = random.choice(CONGRATS_MESSAGES)
         embed = discord.Embed(
             title=f"It was **{movie_title}** ({self.game.current_round.shot.movie_year})"
         )
@@ -473,12 +695,11 @@ class DiscordUi:
         )
         new_combo = min(scored_points + 1, MAX_COMBO)
         pts_description = "pt" if scored_points < 2 else "pts"
-        asyncio.gather(
-            message.add_reaction("✅"),
-            self.channel.send(
-                f"@{player} {congrats_message}! You earn **{scored_points} {pts_description}**. Keep scoring to use your {new_combo}x multiplier!",
-                embed=embed,
-            ),
+        # The ✅ is part of the message rather than a reaction on the guess, to
+        # save an API call
+        await self.channel.send(
+            f"✅ @{player} {congrats_message}! You earn **{scored_points} {pts_description}**. Keep scoring to use your {new_combo}x multiplier!",
+            embed=embed,
         )
 
     async def incorrect_guess(self, player, guess, message):
@@ -486,7 +707,6 @@ class DiscordUi:
 
     async def new_shot(self, shot_number):
         shot = self.game.current_round.shot
-        filename = shot.image_url[shot.image_url.rfind("/") :]
         embed = discord.Embed(
             title="Guess the movie! ⬆",
             description="To skip it, react with ⏭.",
@@ -497,7 +717,7 @@ class DiscordUi:
             files=[
                 discord.File(
                     fp=io.BytesIO(shot.image_data),
-                    filename=filename,
+                    filename=shot.image_filename,
                 )
             ],
         )
@@ -522,20 +742,10 @@ class DiscordUi:
         )
         await self.channel.send("The movie quiz is finished!", embed=embed)
 
-        try:
-            existing_stats = GameStats.load(
-                get_stats_file_path(self.channel.id), difficulty=Difficulty.ALL
-            )
-        except FileNotFoundError:
-            stats = [self.game.stats]
-        else:
-            stats = existing_stats + [self.game.stats]
-
         if not os.path.exists(STATS_DIR):
             os.makedirs(STATS_DIR)
 
-        with open(get_stats_file_path(self.channel.id), "w") as f:
-            f.write(json.dumps([stat.asdict() for stat in stats]))
+        self.game.stats.save(get_stats_file_path(self.channel.id))
 
     async def shot_skipped(self):
         embed = discord.Embed(
@@ -551,13 +761,31 @@ class WtmClient(discord.Client):
         self.uis = {}
         self.wtm_user = wtm_user
         self.wtm_password = wtm_password
-        self.tmdb_token = tmdb_token
+        # Set in `on_ready`, once the bot user is known
+        self.command_re = None
+        # Shared by all games so that connections to whatthemovie.com and TMDb
+        # are kept alive between games
+        self.http_transport = httpx.AsyncHTTPTransport(
+            http2=True, limits=httpx.Limits(max_keepalive_connections=10)
+        )
+        # Shared by all games so that TMDb lookups are cached between games
+        self.tmdb_client = TmdbClient(tmdb_token, transport=self.http_transport)
+        # Used to compare guesses outside of the event loop
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+    async def close(self):
+        await super().close()
+        await self.http_transport.aclose()
+        self.executor.shutdown(wait=False)
 
     def get_game(self, channel_id):
         return self.uis[channel_id].game
 
     async def on_ready(self):
         logger.info("Logged in as %s", self.user)
+        self.command_re = re.compile(
+            rf"<@!?{self.user.id}>\s*(\w+)(?:\s+(.*))?", re.DOTALL
+        )
 
     async def start_game(self, channel, difficulty):
         try:
@@ -580,8 +808,10 @@ class WtmClient(discord.Client):
         game = Game(
             wtm_user=self.wtm_user,
             wtm_password=self.wtm_password,
-            tmdb_token=self.tmdb_token,
+            tmdb_client=self.tmdb_client,
             difficulty=difficulty,
+            http_transport=self.http_transport,
+            executor=self.executor,
         )
         ui = DiscordUi(channel, game)
 
@@ -595,7 +825,7 @@ class WtmClient(discord.Client):
 
     async def show_stats(self, channel, difficulty):
         try:
-            game_stats = GameStats.load(
+            stats = GameStats.load_stats(
                 get_stats_file_path(channel.id), difficulty=difficulty
             )
         except FileNotFoundError:
@@ -618,45 +848,34 @@ class WtmClient(discord.Client):
         )
         player_stats = {}
 
-        for game in game_stats:
-            for player_id, stat in game.stats.items():
-                player_stats.setdefault(player_id, []).append(
-                    PlayerStat(
-                        player_id=stat.player_id,
-                        player_name=stat.player_name,
-                        nb_guesses=stat.nb_guesses,
-                        nb_shots_played=stat.nb_shots_played,
-                        nb_correct_guesses=stat.nb_correct_guesses,
-                        nb_skips=stat.nb_skips,
-                        nb_aces=stat.nb_aces,
-                        max_streak=stat.max_streak,
-                        reaction_time=stat.reaction_time,
-                        precision=stat.precision,
-                    )
-                )
+        for stat in stats:
+            try:
+                player_stats[stat.player_id].add(stat)
+            except KeyError:
+                player_stats[stat.player_id] = PlayerStat.from_stat(stat)
 
-        ranking = sorted(
-            [sum(stats[1:], stats[0]) for stats in player_stats.values()],
+        ranking = heapq.nlargest(
+            10,
+            player_stats.values(),
             key=lambda item: (item.avg_correct_guesses_per_game, item.nb_games),
-            reverse=True,
         )
 
-        for position, stat in enumerate(ranking[:10], 1):
+        for position, stat in enumerate(ranking, 1):
             table.add_row(
-                str(position),
+                position,
                 stat.player_name,
-                str(stat.nb_games),
-                str(f"{stat.avg_correct_guesses_per_game:.2f}"),
-                str(stat.nb_guesses),
-                str(stat.nb_correct_guesses),
-                str(stat.max_streak),
-                str(f"{stat.reaction_time:.2f}"),
+                stat.nb_games,
+                f"{stat.avg_correct_guesses_per_game:.2f}",
+                stat.nb_guesses,
+                stat.nb_correct_guesses,
+                stat.max_streak,
+                f"{stat.reaction_time:.2f}",
             )
 
         await channel.send(
             f"""
 ```
-{str(table)}
+{table}
 ```"""
         )
 
@@ -698,15 +917,9 @@ class WtmClient(discord.Client):
             and (not game or game.status == GameStatus.IDLE)
         ):
             if command.args:
-                try:
-                    difficulty = Difficulty(command.args[0])
-                except ValueError:
-                    await message.channel.send(
-                        "Please select a valid difficulty: "
-                        + ", ".join(
-                            [f"**{difficulty.value}**" for difficulty in Difficulty]
-                        )
-                    )
+                difficulty = DIFFICULTIES_BY_VALUE.get(command.args[0])
+                if difficulty is None:
+                    await message.channel.send(INVALID_DIFFICULTY_MESSAGE)
                     return
             else:
                 difficulty = Difficulty.EASY
@@ -718,15 +931,9 @@ class WtmClient(discord.Client):
             )
         elif command and command.type == CommandType.STATS and not game:
             if command.args:
-                try:
-                    difficulty = Difficulty(command.args[0])
-                except ValueError:
-                    await message.channel.send(
-                        "Please select a valid difficulty: "
-                        + ", ".join(
-                            [f"**{difficulty.value}**" for difficulty in Difficulty]
-                        )
-                    )
+                difficulty = DIFFICULTIES_BY_VALUE.get(command.args[0])
+                if difficulty is None:
+                    await message.channel.send(INVALID_DIFFICULTY_MESSAGE)
                     return
             else:
                 difficulty = Difficulty.ALL
@@ -734,9 +941,7 @@ class WtmClient(discord.Client):
             await self.show_stats(message.channel, difficulty)
         elif game and game.status == GameStatus.WAITING_FOR_GUESSES:
             stripped_content = message.content.strip()
-            if not (
-                stripped_content.startswith("(") and stripped_content.endswith(")")
-            ):
+            if is_guess(stripped_content):
                 await game.handle_guess(
                     player_name=message.author.name,
                     player_id=message.author.id,
@@ -745,25 +950,24 @@ class WtmClient(discord.Client):
                 )
 
     def get_command(self, message):
-        match = re.match(r"<@!?(\d+)>(.*)", message.content)
-        if not match:
+        # Almost no message is a command, don't even call the regex for those
+        if not message.content.startswith("<@"):
             return None
 
-        mention_user_id = match.group(1)
-        if mention_user_id != str(self.user.id):
+        match = self.command_re.match(message.content)
+        if not match:
             return None
 
-        command = match.group(2).strip()
-        try:
-            command_type, *args = command.split(" ")
-        except ValueError:
-            command_type = command
-            args = []
+        command_type, args = match.groups()
 
-        return Command(type=CommandType(command_type), args=args)
+        return Command(
+            type=CommandType(command_type), args=args.split() if args else []
+        )
 
 
 def main():
+    logging.basicConfig(level=logging.INFO)
+
     env_vars = {
         var_name: os.environ.get(var_name)
         for var_name in ("WTM_USER", "WTM_PASSWORD", "DISCORD_TOKEN", "TMDB_TOKEN")
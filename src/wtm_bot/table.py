@@ -19,53 +19,38 @@ class Table:
         self.headings = headings
         self.padding = 1
         self.rows = []
-        self._maxlen = []
+        self._maxlen = [len(heading.label) for heading in headings]
 
     def __str__(self) -> str:
         return self.as_str()
 
     def add_row(self, *args):
-        self.rows.append(args)
+        row = [str(arg) for arg in args]
+        self.rows.append(row)
 
-        for pos, arg in enumerate(args):
-            arg_len = len(str(arg))
-            try:
-                self._maxlen[pos] = max(
-                    self._maxlen[pos], arg_len, len(self.headings[pos].label)
-                )
-            except IndexError:
-                self._maxlen.append(max(arg_len, len(self.headings[pos].label)))
+        for pos, col in enumerate(row):
+            if len(col) > self._maxlen[pos]:
+                self._maxlen[pos] = len(col)
 
     def col_width(self, col_number: int) -> int:
-        try:
-            col_width = self._maxlen[col_number]
-        except IndexError:
-            col_width = 0
-
-        return col_width + self.padding * 2
+        return self._maxlen[col_number] + self.padding * 2
 
     def as_str(self) -> str:
         padding = " " * self.padding
-        buff = "┏"
-
-        for col_number, col in enumerate(self.headings):
-            buff += "━" * self.col_width(col_number)
-            buff += "┳" if col_number < len(self.headings) - 1 else "┓"
+        col_numbers = range(len(self.headings))
+        parts = []
 
-        buff += "\n"
+        parts.append("┏")
+        parts.append("┳".join("━" * self.col_width(i) for i in col_numbers))
+        parts.append("┓\n")
 
         for col_number, heading in enumerate(self.headings):
             label = heading.label.ljust(self._maxlen[col_number])
-            buff += f"┃{padding}{label}{padding}"
+            parts.append(f"┃{padding}{label}{padding}")
 
-        buff += "┃\n"
-        buff += "┡"
-
-        for col_number, col in enumerate(self.headings):
-            buff += "━" * self.col_width(col_number)
-            buff += "╇" if col_number < len(self.headings) - 1 else "┩"
-
-        buff += "\n"
+        parts.append("┃\n┡")
+        parts.append("╇".join("━" * self.col_width(i) for i in col_numbers))
+        parts.append("┩\n")
 
         for row in self.rows:
             for col_number, col in enumerate(row):
@@ -77,14 +62,12 @@ class Table:
                 )
                 label = just_func(self._maxlen[col_number])
 
-                buff += f"│{padding}{label}{padding}"
-
-            buff += "│\n"
+                parts.append(f"│{padding}{label}{padding}")
 
-        buff += "└"
+            parts.append("│\n")
 
-        for col_number, col in enumerate(self.headings):
-            buff += "─" * self.col_width(col_number)
-            buff += "┴" if col_number < len(self.headings) - 1 else "┘"
+        parts.append("└")
+        parts.append("┴".join("─" * self.col_width(i) for i in col_numbers))
+        parts.append("┘")
 
-        return buff
+        return "".join(parts)
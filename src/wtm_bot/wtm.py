@@ -7,6 +7,7 @@ from typing import List, Optional
 
 import bs4
 import httpx
+import soupsieve
 
 
 class Difficulty(enum.Enum):
@@ -20,13 +21,25 @@ class Difficulty(enum.Enum):
 class Shot:
     image_data: bytes
     image_url: str
+    image_filename: str
     movie_title: Optional[str]
     movie_alternative_titles: List[str]
     movie_year: Optional[int]
 
+    @property
+    def all_titles(self):
+        titles = frozenset({self.movie_title, *self.movie_alternative_titles})
+        return titles - {None}
+
 
 js_unicode_re = re.compile(r"\\u([0-9a-f]{4})")
+title_re = re.compile(r'setAmazonMovieName\((["\'])(?P<title>.*)\1\)')
+year_re = re.compile(r"<strong>.+\((\d+)\)</strong>")
+tag_links_selector = soupsieve.compile("#shot_tag_list li a")
 tmdb_base_url = "https://api.themoviedb.org/3"
+http_timeout = httpx.Timeout(10.0, connect=5.0)
+alternative_titles_cache_size = 2048
+nsfw_tags = frozenset({"nude", "nudity", "boob", "boobs"})
 
 
 def wtm_url(url):
@@ -34,7 +47,7 @@ def wtm_url(url):
 
 
 def get_parser(content):
-    return bs4.BeautifulSoup(content, "html.parser")
+    return bs4.BeautifulSoup(content, "lxml")
 
 
 def unescape_js_unicode(match):
@@ -42,9 +55,12 @@ def unescape_js_unicode(match):
 
 
 class TmdbClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, transport=None):
         self.api_key = api_key
-        self.client = httpx.AsyncClient()
+        self.client = httpx.AsyncClient(transport=transport, timeout=http_timeout)
+        # Maps (title, year) to alternative titles, ordered from least to most
+        # recently used
+        self.alternative_titles_cache = {}
 
     async def get_movie_name(self, movie_id, lang):
         url = tmdb_base_url + f"/movie/{movie_id}"
@@ -65,6 +81,22 @@ class TmdbClient:
             return None
 
     async def get_alternative_titles(self, title, year):
+        key = (title, year)
+        try:
+            alternative_titles = self.alternative_titles_cache.pop(key)
+        except KeyError:
+            alternative_titles = await self._get_alternative_titles(title, year)
+            # Don't cache empty results, they're usually caused by TMDb errors
+            if not alternative_titles:
+                return alternative_titles
+
+        if len(self.alternative_titles_cache) >= alternative_titles_cache_size:
+            del self.alternative_titles_cache[next(iter(self.alternative_titles_cache))]
+        self.alternative_titles_cache[key] = alternative_titles
+
+        return alternative_titles
+
+    async def _get_alternative_titles(self, title, year):
         url = tmdb_base_url + "/search/movie"
 
         try:
@@ -73,36 +105,38 @@ class TmdbClient:
                 params={"api_key": self.api_key, "query": title, "year": year},
             )
         except (httpx.ReadTimeout, httpx.ConnectTimeout):
-            return set()
+            return frozenset()
 
         if response.status_code != 200:
-            return set()
+            return frozenset()
 
         try:
             response_data = response.json()
             if not response_data["results"]:
-                return set()
+                return frozenset()
         except (ValueError, KeyError):
-            return set()
+            return frozenset()
 
         movie_id = response_data["results"][0]["id"]
         titles = await asyncio.gather(
             *[self.get_movie_name(movie_id, lang) for lang in ("fr-FR", "en-US")]
         )
-        return set(title for title in titles if title)
+        return frozenset(title for title in titles if title)
 
 
 class WtmSession:
-    def __init__(self, tmdb_token):
-        self.client = httpx.AsyncClient()
-        self.tmdb_client = TmdbClient(tmdb_token)
+    def __init__(self, tmdb_client, transport=None):
+        # The transport (and thus the connection pool) can be shared between
+        # sessions, while cookies and headers stay specific to each session
+        self.client = httpx.AsyncClient(transport=transport, timeout=http_timeout)
+        self.tmdb_client = tmdb_client
 
     async def login(self, username, password):
         login_url = wtm_url("/user/login")
         response = await self.client.get(login_url)
-        token = get_parser(response.content).select("input[name='authenticity_token']")[
-            0
-        ]["value"]
+        token = get_parser(response.content).find(
+            "input", attrs={"name": "authenticity_token"}
+        )["value"]
         response = await self.client.post(
             login_url,
             data={
@@ -114,9 +148,9 @@ class WtmSession:
             follow_redirects=True,
         )
 
-        csrf_token = get_parser(response.content).select("meta[name='csrf-token']")[0][
-            "content"
-        ]
+        csrf_token = get_parser(response.content).find(
+            "meta", attrs={"name": "csrf-token"}
+        )["content"]
         self.client.headers = {"X-CSRF-Token": csrf_token}
 
     async def set_difficulty(self, difficulty):
@@ -130,6 +164,43 @@ class WtmSession:
             },
         )
 
+    async def _get_solution(self, shot_response, shot_parser, solution_url):
+        """
+        Return a `(title, year, alternative_titles)` tuple for the given shot
+        page. Title and year are `None` if the shot doesn't have a solution.
+        """
+        if not solution_url:
+            return (None, None, set())
+
+        solution_response = await self.client.get(
+            wtm_url(solution_url),
+            headers={
+                "Referer": str(shot_response.url),
+                "X-CSRF-Token": shot_parser.find("meta", attrs={"name": "csrf-token"})[
+                    "content"
+                ],
+                "X-Requested-With": "XMLHttpRequest",
+            },
+        )
+        solution_code = solution_response.content.decode()
+        # Most solutions don't contain any escaped character, in which case a
+        # substring search is cheaper than a regex pass
+        if "\\u" in solution_code:
+            solution_code = js_unicode_re.sub(unescape_js_unicode, solution_code)
+        title_match = title_re.search(solution_code)
+        year_match = year_re.search(solution_code)
+
+        if not title_match or not year_match:
+            return (None, None, set())
+
+        title = urllib.parse.unquote_plus(title_match.group("title").strip())
+        year = int(year_match.group(1))
+        alternative_titles = await self.tmdb_client.get_alternative_titles(
+            title, year
+        ) - {title}
+
+        return (title, year, alternative_titles)
+
     async def _get_random_shot(self, nsfw_ok, exclude_tags=None):
         shot = None
 
@@ -138,58 +209,29 @@ class WtmSession:
                 wtm_url("/shot/random"), follow_redirects=True
             )
             parser = get_parser(response.content)
-            image = parser.select("#still_shot")[0]["src"]
-            try:
-                solution_url = parser.select("#solucebutton")[0]["href"]
-            except IndexError:
-                solution_url = None
+            image = parser.find(id="still_shot")["src"]
+            solution_button = parser.find(id="solucebutton")
+            solution_url = solution_button["href"] if solution_button else None
 
-            nsfw = len(parser.select("div.nsfw")) > 0
+            nsfw = parser.find("div", class_="nsfw") is not None
             if nsfw and not nsfw_ok:
                 continue
 
             if exclude_tags:
-                tags = {
-                    element.text for element in parser.select("#shot_tag_list li a")
-                }
-                if tags & exclude_tags:
+                if any(
+                    element.text in exclude_tags
+                    for element in tag_links_selector.select(parser)
+                ):
                     continue
 
-            title = None
-            year = None
-            alternative_titles = set()
-            if solution_url:
-                solution_response = await self.client.get(
-                    wtm_url(solution_url),
-                    headers={
-                        "Referer": str(response.url),
-                        "X-CSRF-Token": parser.select("meta[name='csrf-token']")[0][
-                            "content"
-                        ],
-                        "X-Requested-With": "XMLHttpRequest",
-                    },
-                )
-                solution_code = js_unicode_re.sub(
-                    unescape_js_unicode, solution_response.content.decode()
-                )
-                title_match = re.search(
-                    r'setAmazonMovieName\((["\'])(?P<title>.*)\1\)', solution_code
-                )
-                year_match = re.search(r"<strong>.+\((\d+)\)</strong>", solution_code)
-
-                if title_match and year_match:
-                    title = urllib.parse.unquote_plus(
-                        title_match.group("title").strip()
-                    )
-                    year = int(year_match.group(1))
-                    alternative_titles = await self.tmdb_client.get_alternative_titles(
-                        title, year
-                    ) - {title}
-
-            r = await self.client.get(image, headers={"Referer": str(response.url)})
+            image_response, (title, year, alternative_titles) = await asyncio.gather(
+                self.client.get(image, headers={"Referer": str(response.url)}),
+                self._get_solution(response, parser, solution_url),
+            )
             shot = Shot(
-                image_data=r.read(),
+                image_data=image_response.content,
                 image_url=str(image),
+                image_filename=str(image).rpartition("/")[2],
                 movie_title=title,
                 movie_alternative_titles=alternative_titles,
                 movie_year=year,
@@ -201,8 +243,6 @@ class WtmSession:
         shot = None
 
         while shot is None or (not shot.movie_title and require_solution):
-            shot = await self._get_random_shot(
-                nsfw_ok=False, exclude_tags={"nude", "nudity", "boob", "boobs"}
-            )
+            shot = await self._get_random_shot(nsfw_ok=False, exclude_tags=nsfw_tags)
 
         return shot